@@ -14,7 +14,9 @@
 # this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import argparse
+import math
 import sys
+import time
 
 from ytls.commands import (
     compare,
@@ -24,6 +26,33 @@ from ytls.commands import (
     base64,
     prettify,
 )
+from ytls.utils import limits, metrics
+
+
+def positive_int(value):
+    """
+    argparse type for options that need a whole number of at least 1.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def positive_float(value):
+    """
+    argparse type for options that need a finite number greater than 0.
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid float value: '{value}'")
+    if not math.isfinite(number) or number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a number greater than 0, got {value}")
+    return number
 
 
 def main():
@@ -32,7 +61,22 @@ def main():
     """
 
     parser = argparse.ArgumentParser(
-        description="ytls: A one-stop shop of YAML-related CLI tools."
+        description="ytls: A one-stop shop of YAML-related CLI tools.",
+        epilog="Exit codes: 1 error, 3 input too large, 4 too many nodes, "
+               "5 nesting too deep, 6 timed out.",
+    )
+
+    # ---- Resource Limits and Metrics (apply to every subcommand) ----
+    parser.add_argument(
+        "--max-bytes", type=limits.parse_size, help="Refuse input files larger than this (e.g. 64M)."
+    )
+    parser.add_argument("--max-nodes", type=positive_int, help="Refuse YAML documents with more nodes than this.")
+    parser.add_argument("--max-depth", type=positive_int, help="Refuse YAML nested deeper than this.")
+    parser.add_argument("--timeout", type=positive_float, help="Abort the run after this many seconds.")
+    parser.add_argument("--metrics-file", help="Write run metrics to this file.")
+    parser.add_argument(
+        "--metrics-format", choices=["prometheus", "statsd"], default="prometheus",
+        help="Format of --metrics-file: Prometheus textfile (replaced) or StatsD lines (appended)."
     )
 
     # Subparsers for each subcommand
@@ -49,6 +93,9 @@ def main():
     compare_parser.add_argument(
         "-i", "--ignore-order", action="store_true", help="Ignore the order of list items in YAML."
     )
+    compare_parser.add_argument(
+        "-j", "--jobs", type=positive_int, help="Diff top-level sections in this many worker processes."
+    )
     compare_parser.set_defaults(func=compare.compare_command)
 
     # ---- Convert Subcommand ----
@@ -82,6 +129,10 @@ def main():
     )
     validate_parser.add_argument("input_file", help="Path to the YAML file.")
     validate_parser.add_argument("-s", "--schema", help="Path to a schema file.")
+    validate_parser.add_argument(
+        "-j", "--jobs", type=positive_int,
+        help="Validate each document against the schema in this many worker processes. Requires --schema."
+    )
     validate_parser.set_defaults(func=validate.validate_command)
 
     # ---- Base64 Subcommand ----
@@ -102,7 +153,16 @@ def main():
         "prettify", help="Read inline YAML from file an output to pretty YAML"
     )
     prettify_parser.add_argument("input_file", help="Path to the first YAML file that contains inline YAML.")
-    prettify_parser.add_argument("output_file", help="Path to output the prettify'd YAML.")
+    prettify_parser.add_argument(
+        "output_file", nargs="?", help="Path to output the prettify'd YAML. Not needed with --in-place or --check."
+    )
+    prettify_mode = prettify_parser.add_mutually_exclusive_group()
+    prettify_mode.add_argument(
+        "--in-place", action="store_true", help="Rewrite the input file in place (atomic replace)."
+    )
+    prettify_mode.add_argument(
+        "--check", action="store_true", help="Exit non-zero if the file would be changed, without writing anything."
+    )
 
     prettify_parser.set_defaults(func=prettify.prettify_command)
 
@@ -114,12 +174,38 @@ def main():
         parser.print_help()
         sys.exit(1)
 
+    limits.configure(
+        max_bytes=args.max_bytes,
+        max_nodes=args.max_nodes,
+        max_depth=args.max_depth,
+        timeout=args.timeout,
+    )
+
     # Dispatch to the chosen subcommand's function
+    exit_code = 0
+    start = time.perf_counter()
     try:
-        args.func(args)
+        with limits.time_limit(args.timeout):
+            args.func(args)
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except limits.LimitExceeded as e:
+        print(f"Error: {e}")
+        exit_code = e.exit_code
     except Exception as e:
         print(f"Error: {e}")
-        sys.exit(1)
+        exit_code = 1
+
+    if args.metrics_file:
+        metrics.incr('run_seconds', time.perf_counter() - start)
+        metrics.incr('exit_code', exit_code)
+        try:
+            metrics.write_metrics(args.metrics_file, args.metrics_format, args.command)
+        except OSError as e:
+            print(f"Error: {e}")
+            exit_code = exit_code or 1
+
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
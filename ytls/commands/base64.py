@@ -13,7 +13,7 @@
 # You should have received a copy of the GNU General Public License along with
 # this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from ytls.utils.file_helpers import load_yaml
+from ytls.utils.file_helpers import read_text
 import base64
 
 
@@ -47,11 +47,7 @@ def encode_base64(input_file: str, output_file: str, split: int = None):
         OSError: If there's a general OS error (e.g., invalid path).
         ValueError: If the data cannot be converted to encoded URL for some reason.
     """
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            raw_yaml = f.read()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Error: File not found - {input_file}")
+    raw_yaml = read_text(input_file)
 
     if isinstance(raw_yaml, str):
         data = raw_yaml.encode('utf-8')  # Convert string to bytes if necessary
@@ -84,11 +80,7 @@ def decode_base64(input_file: str, output_file: str):
         OSError: If there's a general OS error (e.g., invalid path).
         ValueError: If the data cannot be converted to encoded URL for some reason.
     """
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-           encoded_yaml = f.read()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Error: File not found - {input_file}")
+    encoded_yaml = read_text(input_file)
 
     if isinstance(encoded_yaml, str):
         data = encoded_yaml.encode('utf-8') 
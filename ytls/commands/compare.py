@@ -18,6 +18,7 @@ from deepdiff import DeepDiff
 from pprint import pprint
 
 from ytls.utils.file_helpers import load_yaml
+from ytls.utils.workers import run_shared
 
 
 def compare_command(args):
@@ -35,7 +36,7 @@ def compare_command(args):
         print(f"Error loading YAML: {e}")
         sys.exit(1)
 
-    differences = compare_yamls(yaml1, yaml2, args.ignore_order)
+    differences = compare_yamls(yaml1, yaml2, args.ignore_order, args.jobs)
 
     if differences:
         print("\nDifferences found:")
@@ -56,9 +57,50 @@ def compare_command(args):
     else:
         print("\nThe YAML files are identical.")
 
-def compare_yamls(yaml1, yaml2, ignore_order=True):
+def compare_yamls(yaml1, yaml2, ignore_order=True, jobs=None):
     """
     Compare two Python dictionaries and return the differences.
+
+    If `jobs` is given and both documents are mappings, the top-level keys are
+    split into batches that are diffed in worker processes. Both trees are placed
+    in shared memory once instead of being pickled for every worker.
     """
-    differences = DeepDiff(yaml1, yaml2, ignore_order=ignore_order)
+    if jobs is None or not (isinstance(yaml1, dict) and isinstance(yaml2, dict)):
+        return DeepDiff(yaml1, yaml2, ignore_order=ignore_order)
+
+    differences = {}
+    removed = [f"root[{key!r}]" for key in yaml1 if key not in yaml2]
+    added = [f"root[{key!r}]" for key in yaml2 if key not in yaml1]
+    if removed:
+        differences['dictionary_item_removed'] = removed
+    if added:
+        differences['dictionary_item_added'] = added
+
+    # Each task carries its keys' positions in both mappings, so workers go
+    # straight to the values without decoding every top-level key. A few
+    # batches per worker keeps DeepDiff's per-call overhead out of the way.
+    positions2 = {key: i for i, key in enumerate(yaml2)}
+    common = [(key, i, positions2[key]) for i, key in enumerate(yaml1) if key in positions2]
+    batches = jobs * 4
+    tasks = [(common[n::batches], ignore_order) for n in range(min(batches, len(common)))]
+    for section in run_shared([yaml1, yaml2], _compare_section, tasks, jobs):
+        for category, items in section.items():
+            if isinstance(items, dict):
+                differences.setdefault(category, {}).update(items)
+            else:
+                differences.setdefault(category, []).extend(items)
     return differences
+
+def _compare_section(root, task):
+    """
+    Worker task: diff a batch of top-level keys of both trees. The batch is diffed
+    as a mapping of those keys, so paths read as if the whole documents had been diffed.
+    """
+    entries, ignore_order = task
+    old = {key: root[0].materialize_value_at(position1) for key, position1, _ in entries}
+    new = {key: root[1].materialize_value_at(position2) for key, _, position2 in entries}
+    section = DeepDiff(old, new, ignore_order=ignore_order)
+    return {
+        category: dict(items) if isinstance(items, dict) else list(items)
+        for category, items in section.items()
+    }
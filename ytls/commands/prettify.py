@@ -13,25 +13,203 @@
 # You should have received a copy of the GNU General Public License along with
 # this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import re
+import sys
 import yaml
-from ytls.utils.file_helpers import load_yaml
+from ytls.utils import limits
+from ytls.utils.file_helpers import read_text, write_atomic
+
+# Leading indentation of a line, counting "- " sequence indicators as indentation.
+_LINE_INDENT = re.compile(r'[ ]*(?:-[ ]+)*')
+
 
 def prettify_command(args):
-    prettify_yaml(args.input_file, args.output_file)
+    """
+    The function to handle the 'prettify' subcommand.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments from the CLI.
+            Expects:
+              - args.input_file: path to the YAML file that contains inline YAML.
+              - args.output_file: path to write the prettified YAML (optional with --in-place/--check).
+              - args.in_place: rewrite `input_file` atomically instead of writing `output_file`.
+              - args.check: only report whether `input_file` needs prettifying.
+    """
+    if (args.check or args.in_place) and args.output_file:
+        raise ValueError("An output file cannot be combined with --in-place or --check.")
+
+    if args.check:
+        if needs_prettify(args.input_file):
+            print(f"'{args.input_file}' would be prettified.")
+            sys.exit(1)
+        print(f"'{args.input_file}' is already pretty.")
+    elif args.in_place:
+        prettify_yaml(args.input_file, args.input_file)
+        print(f"Prettify successful! '{args.input_file}' rewritten in place.")
+    elif args.output_file:
+        prettify_yaml(args.input_file, args.output_file)
+        print(f"Prettify successful! YAML written to '{args.output_file}'.")
+    else:
+        raise ValueError("An output file is required unless --in-place or --check is given.")
+
+
+def needs_prettify(input_file: str) -> bool:
+    """
+    Return True if `input_file` contains flow-style collections that would be rewritten.
+    """
+    text = read_text(input_file, newline='')
+    return prettify_text(text) != text
 
 
 def prettify_yaml(input_file: str, output_file: str):
-    data = load_yaml(input_file)
-    
+    """
+    Rewrites the flow-style collections in `input_file` into block style and writes
+    the result to `output_file`. Writing to `input_file` itself replaces it atomically.
+
+    Raises:
+        FileNotFoundError: If `input_file` cannot be found.
+        PermissionError: If `output_file` cannot be written to (no permission).
+        OSError: If there's a general OS error (e.g., invalid path).
+        ValueError: If `input_file` is not valid YAML.
+    """
+    # Read and write with newline='' so CRLF files keep their line endings.
+    text = read_text(input_file, newline='')
+    pretty = prettify_text(text)
+
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False)
-            
+        if pretty == text and output_file == input_file:
+            return
+        write_atomic(output_file, pretty, newline='')
     except PermissionError:
         raise PermissionError(f"Error: You do not have permission to write to '{output_file}'.")
     except OSError as e:
         raise OSError(f"Error writing to file '{output_file}': {e}")
-    except TypeError as e:
-        raise TypeError(f"Data in '{input_file}' is not YAML-serializable: {e}")
 
-    
+
+def prettify_text(text: str) -> str:
+    """
+    Expand every flow-style collection (`{...}` / `[...]`) in `text` into block style.
+
+    Works on the parser's event stream rather than on loaded data: only the source
+    spans of flow collections are re-emitted, everything else (comments, key order,
+    quoting, anchors) is copied through verbatim. Flow collections used as mapping
+    keys, empty collections and collections containing comments are left as they are.
+    """
+    if text.startswith('\ufeff'):
+        # libyaml leaves a leading BOM out of its mark indexes; keep both parsers aligned.
+        return '\ufeff' + prettify_text(text[1:])
+
+    newline = '\r\n' if '\r\n' in text else '\n'
+    out = []
+    pos = 0
+    stack = []      # [is_mapping, nodes_seen] for each open block collection
+    region = None   # events of the flow collection currently being collected
+    depth = 0
+    is_key = False
+
+    try:
+        for event in limits.check_events(yaml.parse(text, Loader=_event_loader(text))):
+            if region is not None:
+                region.append(event)
+                if isinstance(event, yaml.CollectionStartEvent):
+                    depth += 1
+                elif isinstance(event, yaml.CollectionEndEvent):
+                    depth -= 1
+                    if depth == 0:
+                        if not is_key and len(region) > 2 and not _has_comment(text, region):
+                            start, block = _render_block(text, region, newline)
+                            out.append(text[pos:start])
+                            out.append(block)
+                            pos = event.end_mark.index
+                        region = None
+                continue
+
+            if isinstance(event, (yaml.NodeEvent, yaml.CollectionStartEvent)):
+                is_key = bool(stack) and stack[-1][0] and stack[-1][1] % 2 == 0
+                if stack:
+                    stack[-1][1] += 1
+
+            if isinstance(event, yaml.CollectionStartEvent):
+                if event.flow_style:
+                    region = [event]
+                    depth = 1
+                else:
+                    stack.append([isinstance(event, yaml.MappingStartEvent), 0])
+            elif isinstance(event, yaml.CollectionEndEvent):
+                stack.pop()
+    except yaml.YAMLError as e:
+        raise ValueError(f"Input is not valid YAML: {e}")
+
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+def _event_loader(text):
+    """
+    Parsing dominates prettify's run time, so use libyaml when PyYAML was built
+    with it. Its marks are character offsets like the pure-Python parser's, except
+    that it skips BOMs, so text containing one falls back to SafeLoader.
+    """
+    if yaml.__with_libyaml__ and '\ufeff' not in text:
+        return yaml.CSafeLoader
+    return yaml.SafeLoader
+
+
+def _has_comment(text, events):
+    """
+    Return True if the flow collection described by `events` contains a comment.
+    Comments can only sit in the gaps between events, where there is otherwise
+    nothing but indicators and whitespace.
+    """
+    return any(
+        '#' in text[before.end_mark.index:after.start_mark.index]
+        for before, after in zip(events, events[1:])
+    )
+
+
+def _render_block(text, events, newline):
+    """
+    Emit the flow collection described by `events` in block style, indented to fit
+    where it sits in `text`. Returns the index the replacement starts at and the
+    replacement text. Any anchor/tag on the collection stays in the source text.
+    """
+    first = events[0]
+    start = first.end_mark.index - 1  # position of the opening '{' or '['
+    prefix = text[text.rfind('\n', 0, start) + 1:start]
+
+    root = first.__class__(None, None, True, flow_style=False)
+    body = [root] + [_as_block(e) for e in events[1:]]
+    emitted = yaml.emit(
+        [yaml.StreamStartEvent(), yaml.DocumentStartEvent(explicit=False)]
+        + body
+        + [yaml.DocumentEndEvent(explicit=False), yaml.StreamEndEvent()],
+        allow_unicode=True,
+        width=2 ** 31,
+    )
+    lines = emitted.rstrip('\n').split('\n')
+    if lines[-1] == '...':
+        lines.pop()
+
+    if _LINE_INDENT.fullmatch(prefix):
+        # Only indentation or "- " indicators precede the collection: start inline.
+        indent = ' ' * len(prefix)
+        return start, newline.join(lines[:1] + [_indent(line, indent) for line in lines[1:]])
+
+    # Something else (a key, properties, "---") precedes it: start on a new line.
+    if prefix.startswith('---'):
+        indent = ''
+    else:
+        indent = ' ' * (_LINE_INDENT.match(prefix).end() + 2)
+    while text[start - 1] in ' \t':
+        start -= 1
+    return start, ''.join(newline + _indent(line, indent) for line in lines)
+
+
+def _indent(line, indent):
+    return indent + line if line else line
+
+
+def _as_block(event):
+    if isinstance(event, yaml.CollectionStartEvent):
+        return event.__class__(event.anchor, event.tag, event.implicit, flow_style=False)
+    return event
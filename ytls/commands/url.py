@@ -17,6 +17,8 @@
 from urllib.parse import quote, unquote
 import yaml
 
+from ytls.utils.file_helpers import parse_yaml, read_text
+
 def url_command(args):
     """
     The function to handle the 'urlencode' subcommand.
@@ -47,11 +49,7 @@ def encode_url(input_file, output_file):
         OSError: If there's a general OS error (e.g., invalid path).
         ValueError: If the data cannot be converted to encoded URL for some reason.
     """
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            raw_yaml = f.read()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Error: File not found - {input_file}")
+    raw_yaml = read_text(input_file)
 
     encoded = quote(raw_yaml, safe='')
 
@@ -77,10 +75,11 @@ def decode_url(input_file, output_file):
     """
     # Read the encoded string from input_file
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            encoded_url = f.read()
+        encoded_url = read_text(input_file)
     except FileNotFoundError:
-        raise FileNotFoundError(f"Error: File not found - {input_file}")
+        # read_text already raises a clear message; keep the OSError
+        # handler below from rewrapping it.
+        raise
     except OSError as e:
         # Catches other I/O errors, like 'PermissionError' on read, but you can split them out if you like
         raise OSError(f"Error reading from '{input_file}': {e}")
@@ -90,7 +89,7 @@ def decode_url(input_file, output_file):
 
     # Parse the decoded text as YAML
     try:
-        data = yaml.safe_load(decoded_yaml)
+        data = parse_yaml(decoded_yaml)
     except yaml.YAMLError as e:
         raise ValueError(f"Decoded text from '{input_file}' is not valid YAML: {e}")
 
@@ -13,17 +13,18 @@
 # You should have received a copy of the GNU General Public License along with
 # this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from ytls.utils.file_helpers import load_yaml
+from ytls.utils.file_helpers import parse_yaml, read_text
+from ytls.utils.workers import materialize, run_shared
 
 import yaml
 import sys
+from pykwalify.compat import yml
 from pykwalify.core import Core
 
 
 def validate_syntax(filepath: str) -> bool:
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            yaml.safe_load(f)
+        parse_yaml(read_text(filepath))
         return True
     except yaml.YAMLError as e:
         print(f"YAML syntax error in {filepath}:\n{e}", file=sys.stderr)
@@ -35,16 +36,73 @@ def validate_syntax(filepath: str) -> bool:
         print(f"Unexpected error reading {filepath}: {e}", file=sys.stderr)
         return False
 
-def validate_schema(input_file: str, schema_file:str) -> True:
+def _read_within_limits(file_path: str) -> str:
+    """
+    Read `file_path` within the byte limit and run it through the limited parser
+    only to enforce the node and depth limits. The result is thrown away: files
+    are loaded the way pykwalify loads them (YAML 1.2), so limits never change
+    what passes validation.
+    """
+    text = read_text(file_path)
     try:
-        c = Core(source_file=input_file, schema_files=[schema_file])
-        c.validate()
-        return True
+        parse_yaml(text, all_documents=True)
+    except yaml.YAMLError:
+        pass  # syntax is for pykwalify's own parser to judge
+    return text
+
+def validate_schema(input_file: str, schema_file: str, jobs: int = None) -> bool:
+    """
+    Validate every document in `input_file` against the schema. With `jobs`, the
+    documents are spread over that many worker processes; the results are the same.
+    """
+    try:
+        _read_within_limits(schema_file)
+        # Let pykwalify load the schema exactly as schema_files does, once,
+        # rather than once per document.
+        schema = Core(source_data={}, schema_files=[schema_file]).schema
+        # An empty file is passed on as a None document so pykwalify reports it.
+        documents = list(yml.load_all(_read_within_limits(input_file))) or [None]
+        if jobs is None:
+            errors = [_check_document(schema, document) for document in documents]
+        else:
+            errors = run_shared([schema, documents], _validate_document, range(len(documents)), jobs)
     except Exception as e:
         print(f"Schema validation error:\n{e}", file=sys.stderr)
         return False
 
+    valid = True
+    for index, error in enumerate(errors):
+        if error is None:
+            continue
+        if len(documents) == 1:
+            print(f"Schema validation error:\n{error}", file=sys.stderr)
+        else:
+            print(f"Schema validation error in document {index + 1}:\n{error}", file=sys.stderr)
+        valid = False
+    return valid
+
+def _check_document(schema, document):
+    """
+    Validate one document against the schema.
+    Returns the error message, or None if the document conforms.
+    """
+    try:
+        c = Core(source_data=document, schema_data=schema)
+        c.validate()
+        return None
+    except Exception as e:
+        return str(e)
+
+def _validate_document(root, index):
+    """
+    Worker task: validate one document against the shared schema.
+    """
+    schema, documents = root
+    return _check_document(materialize(schema), materialize(documents[index]))
+
 def validate_command(args):
+    if args.jobs is not None and args.schema is None:
+        raise ValueError("--jobs requires --schema.")
     if args.schema is None:
         if validate_syntax(args.input_file):
             print(f"'{args.input_file}' is valid YAML syntax.")
@@ -52,5 +110,5 @@ def validate_command(args):
         else:
             print(f"'{args.input_file}' is invalid YAML.")
     else:
-        if validate_schema(args.input_file, args.schema):
+        if validate_schema(args.input_file, args.schema, args.jobs):
             print(f"'{args.input_file}' conforms to the schema found in '{args.schema}'")
@@ -13,22 +13,99 @@
 # You should have received a copy of the GNU General Public License along with
 # this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
+import os
 import sys
+import tempfile
+import time
 import yaml
 from pprint import pprint
 
+from ytls.utils import limits, metrics
+
+# Parsed files for this run, keyed by (path, mtime, size).
+_cache = {}
+
+def read_text(file_path, newline=None):
+    """
+    Read a file as UTF-8 text, enforcing the configured input size limit.
+    `newline` is passed to `open`; use '' to keep line endings as they are.
+
+    Raises:
+        FileNotFoundError: If `file_path` cannot be found.
+        InputTooLarge: If the file is larger than the max input bytes.
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            limits.check_bytes(os.fstat(file.fileno()).st_size, file_path)
+            max_bytes = limits.active().max_bytes
+            raw = file.read() if max_bytes is None else file.read(max_bytes + 1)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Error: File not found - {file_path}")
+    # Pipes and other special files report no size up front, so check what was read.
+    limits.check_bytes(len(raw), file_path)
+
+    metrics.incr('files_processed')
+    metrics.incr('bytes_read', len(raw))
+    # Same decoding and newline handling as open(file_path, 'r', encoding='utf-8', newline=newline).
+    return io.TextIOWrapper(io.BytesIO(raw), encoding='utf-8', newline=newline).read()
+
+def parse_yaml(text, all_documents=False):
+    """
+    Parse `text` with the node and depth limits applied, recording parse time.
+    """
+    start = time.perf_counter()
+    try:
+        if all_documents:
+            return list(yaml.load_all(text, Loader=limits.LimitedLoader))
+        return yaml.load(text, Loader=limits.LimitedLoader)
+    finally:
+        metrics.incr('parse_seconds', time.perf_counter() - start)
+
 def load_yaml(file_path):
     """
     Load a YAML file and return its contents as a Python dictionary.
+
+    Results are cached for the rest of the run, so loading an unchanged file again
+    returns the same object; callers must not modify it.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = yaml.safe_load(file)
-            #print(f"\nLoaded '{file_path}':")
-            #pprint(data)
-            return data
+        stat = os.stat(file_path)
     except FileNotFoundError:
         raise FileNotFoundError(f"Error: File not found - {file_path}")
+    key = (os.path.realpath(file_path), stat.st_mtime_ns, stat.st_size)
+    if key in _cache:
+        metrics.incr('cache_hits')
+        return _cache[key]
+
+    try:
+        data = parse_yaml(read_text(file_path))
     except yaml.YAMLError as exc:
         raise yaml.YAMLError(f"Error parsing YAML file {file_path}: {exc}")
+    _cache[key] = data
+    return data
 
+def write_atomic(file_path, text, newline=None):
+    """
+    Write `text` to `file_path` by way of a temporary file in the same directory,
+    so readers never observe a partially written file. `newline` is passed to `open`.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".ytls-", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline=newline) as f:
+            f.write(text)
+        # mkstemp creates the file 0600; give it the existing file's mode, or the
+        # mode open() would have used for a new file.
+        if os.path.exists(file_path):
+            mode = os.stat(file_path).st_mode & 0o7777
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,195 @@
+# ytls - YAML Tools
+# Copyright (C) 2025 Aaron Mathis
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of  MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import signal
+from contextlib import contextmanager
+
+import yaml
+
+
+class LimitExceeded(BaseException):
+    """
+    Base class for resource-limit failures. `exit_code` is the process exit
+    status the CLI uses when this limit is hit.
+
+    Derives from BaseException (like KeyboardInterrupt) so the `except Exception`
+    handlers in the commands cannot turn a limit, notably the timeout, into an
+    ordinary error with exit status 1.
+    """
+    exit_code = 1
+
+
+class InputTooLarge(LimitExceeded):
+    exit_code = 3
+
+
+class TooManyNodes(LimitExceeded):
+    exit_code = 4
+
+
+class TooDeep(LimitExceeded):
+    exit_code = 5
+
+
+class TimeLimitExceeded(LimitExceeded):
+    exit_code = 6
+
+
+class Limits:
+    """
+    Resource limits applied to every file read during a run. None means unlimited.
+    """
+
+    def __init__(self, max_bytes=None, max_nodes=None, max_depth=None, timeout=None):
+        self.max_bytes = max_bytes
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.timeout = timeout
+
+
+_active = Limits()
+
+
+def configure(**kwargs):
+    """
+    Replace the limits in effect for this process.
+    """
+    global _active
+    _active = Limits(**kwargs)
+
+
+def active() -> Limits:
+    return _active
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a byte count with an optional K, M or G suffix (powers of 1024), e.g. '64M'.
+    """
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = value.strip().upper().rstrip('B')
+    multiplier = 1
+    if text and text[-1] in units:
+        multiplier = units[text[-1]]
+        text = text[:-1]
+    try:
+        size = int(float(text) * multiplier)
+    except (ValueError, OverflowError):
+        raise ValueError(f"Invalid size: '{value}'")
+    if size < 0:
+        raise ValueError(f"Invalid size: '{value}'")
+    return size
+
+
+def check_bytes(size: int, file_path: str):
+    """
+    Raises:
+        InputTooLarge: If `size` exceeds the configured max input bytes.
+    """
+    max_bytes = _active.max_bytes
+    if max_bytes is not None and size > max_bytes:
+        raise InputTooLarge(f"'{file_path}' is larger than the {max_bytes} byte input limit.")
+
+
+def check_events(events):
+    """
+    Pass a `yaml.parse` event stream through, enforcing the node and depth limits.
+    For callers that work on events and never build a node tree.
+    """
+    max_nodes = _active.max_nodes
+    max_depth = _active.max_depth
+    nodes = 0
+    depth = 0
+    for event in events:
+        if isinstance(event, yaml.NodeEvent):
+            nodes += 1
+            if max_nodes is not None and nodes > max_nodes:
+                raise TooManyNodes(f"Input has more than {max_nodes} nodes.")
+        if isinstance(event, yaml.CollectionStartEvent):
+            depth += 1
+            if max_depth is not None and depth > max_depth:
+                raise TooDeep(f"Input is nested deeper than {max_depth} levels.")
+        elif isinstance(event, yaml.CollectionEndEvent):
+            depth -= 1
+        yield event
+
+
+class LimitedLoader(yaml.SafeLoader):
+    """
+    SafeLoader that enforces the node and depth limits while composing, before
+    any Python objects are built. Aliases count as the size of the node they
+    refer to, so alias expansion ("billion laughs") cannot bypass the node limit.
+    Depth counts open collections, as in `check_events`.
+    """
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self._node_count = 0
+        self._depth = 0
+        self._anchor_sizes = {}
+
+    def _count(self, amount):
+        self._node_count += amount
+        max_nodes = _active.max_nodes
+        if max_nodes is not None and self._node_count > max_nodes:
+            raise TooManyNodes(f"Input has more than {max_nodes} nodes.")
+
+    def compose_node(self, parent, index):
+        event = self.peek_event()
+        if isinstance(event, yaml.AliasEvent):
+            self._count(self._anchor_sizes.get(event.anchor, 1))
+            return super().compose_node(parent, index)
+
+        nested = isinstance(event, yaml.CollectionStartEvent)
+        if nested:
+            self._depth += 1
+            max_depth = _active.max_depth
+            if max_depth is not None and self._depth > max_depth:
+                raise TooDeep(f"Input is nested deeper than {max_depth} levels.")
+        start = self._node_count
+        self._count(1)
+        try:
+            node = super().compose_node(parent, index)
+        finally:
+            if nested:
+                self._depth -= 1
+        if event.anchor is not None:
+            self._anchor_sizes[event.anchor] = self._node_count - start
+        return node
+
+
+def _on_alarm(signum, frame):
+    raise TimeLimitExceeded(f"Run exceeded the {_active.timeout} second time limit.")
+
+
+@contextmanager
+def time_limit(seconds):
+    """
+    Raise TimeLimitExceeded in the main thread if the block runs longer than
+    `seconds` of wall-clock time. Does nothing when `seconds` is None.
+    """
+    if seconds is None:
+        yield
+        return
+    if not hasattr(signal, 'setitimer'):
+        raise ValueError("--timeout is not supported on this platform.")
+
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
@@ -0,0 +1,110 @@
+# ytls - YAML Tools
+# Copyright (C) 2025 Aaron Mathis
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of  MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# name: (kind, help text). Kind is the Prometheus type; StatsD lines follow it.
+METRICS = {
+    'files_processed': ('counter', "Input files read."),
+    'bytes_read': ('counter', "Bytes read from input files."),
+    'parse_seconds': ('gauge', "Time spent parsing YAML."),
+    'run_seconds': ('gauge', "Wall-clock time of the run."),
+    'peak_rss_bytes': ('gauge', "Peak resident set size of the process."),
+    'cache_hits': ('counter', "Files served from the parsed-file cache."),
+    'exit_code': ('gauge', "Exit status of the run."),
+}
+
+_values = dict.fromkeys(METRICS, 0)
+
+
+def incr(name, amount=1):
+    """
+    Add `amount` to the metric `name` for the current run.
+    """
+    _values[name] += amount
+
+
+def snapshot() -> dict:
+    """
+    Return the current metric values, with peak RSS filled in.
+    """
+    values = dict(_values)
+    values['peak_rss_bytes'] = peak_rss_bytes()
+    return values
+
+
+def peak_rss_bytes() -> int:
+    if resource is None:
+        return 0
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_prometheus(values: dict, command: str) -> str:
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        metric = f"ytls_{name}_total" if kind == 'counter' else f"ytls_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.append(f'{metric}{{command="{command}"}} {values[name]}')
+    return "\n".join(lines) + "\n"
+
+
+def format_statsd(values: dict, command: str) -> str:
+    lines = []
+    for name, (kind, _) in METRICS.items():
+        if name.endswith('_seconds'):
+            lines.append(f"ytls.{command}.{name[:-len('_seconds')]}:{values[name] * 1000:.3f}|ms")
+        else:
+            lines.append(f"ytls.{command}.{name}:{values[name]}|{'c' if kind == 'counter' else 'g'}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(output_file: str, fmt: str, command: str):
+    """
+    Write this run's metrics to `output_file`.
+
+    Prometheus output replaces the file atomically, as the node_exporter textfile
+    collector expects. StatsD lines are appended so a shipper can tail the file.
+
+    Raises:
+        PermissionError: If `output_file` cannot be written to (no permission).
+        OSError: If there's a general OS error (e.g., invalid path).
+    """
+    # Imported here because file_helpers imports this module to record metrics.
+    from ytls.utils.file_helpers import write_atomic
+
+    values = snapshot()
+    try:
+        if fmt == "prometheus":
+            write_atomic(output_file, format_prometheus(values, command))
+        elif fmt == "statsd":
+            with open(output_file, 'a', encoding='utf-8') as f:
+                f.write(format_statsd(values, command))
+        else:
+            raise ValueError(f"Unsupported metrics format: {fmt}")
+    except PermissionError as e:
+        raise PermissionError(f"No permission to write to '{output_file}': {e}")
+    except OSError as e:
+        raise OSError(f"Could not write to '{output_file}': {e}")
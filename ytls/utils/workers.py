@@ -0,0 +1,337 @@
+# ytls - YAML Tools
+# Copyright (C) 2025 Aaron Mathis
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of  MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Worker-pool execution over a parsed YAML tree held in shared memory.
+
+The tree is flattened once into a single buffer:
+
+    header | node records | child index table | string/bytes heap
+
+Each node record is (kind, a, b). Scalars keep their value in `a` (or an
+offset/length pair into the heap), containers keep an offset/count pair into
+the child table, where mappings store key and value indices alternately.
+A container reached through several aliases is stored once and referenced,
+so shared and self-referencing structures survive the round trip.
+Workers attach to the buffer by name and walk it through `LazyMapping` /
+`LazySequence` views, materializing only the parts they actually use.
+"""
+
+import datetime
+import struct
+from collections.abc import Mapping, Sequence
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+_MAGIC = b'YTLS'
+_HEADER = struct.Struct('<4sIII')  # magic, node count, child count, heap size
+_NODE = struct.Struct('<B7xqq')    # kind, a, b
+_CHILD = struct.Struct('<I')
+
+(
+    _NULL, _FALSE, _TRUE, _INT, _BIGINT, _FLOAT,
+    _STR, _BYTES, _DATE, _DATETIME, _LIST, _MAP, _SET,
+) = range(13)
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# Set in each worker process by the pool initializer.
+_worker_shm = None
+_worker_root = None
+
+
+def flatten_tree(data) -> bytes:
+    """
+    Serialize `data` (as produced by `yaml.safe_load`) into the flat buffer format.
+
+    Raises:
+        TypeError: If `data` contains a value that has no flat representation.
+    """
+    nodes = []
+    children = []
+    heap = bytearray()
+    shared = {}  # id() of each container already added -> its node index
+
+    def heap_ref(raw):
+        offset = len(heap)
+        heap.extend(raw)
+        return offset, len(raw)
+
+    def add(value):
+        if id(value) in shared:
+            return shared[id(value)]
+        index = len(nodes)
+        nodes.append(None)
+        if value is None:
+            record = (_NULL, 0, 0)
+        elif value is True:
+            record = (_TRUE, 0, 0)
+        elif value is False:
+            record = (_FALSE, 0, 0)
+        elif isinstance(value, int):
+            if _INT64_MIN <= value <= _INT64_MAX:
+                record = (_INT, value, 0)
+            else:
+                record = (_BIGINT,) + heap_ref(str(value).encode('ascii'))
+        elif isinstance(value, float):
+            record = (_FLOAT, struct.unpack('<q', struct.pack('<d', value))[0], 0)
+        elif isinstance(value, str):
+            record = (_STR,) + heap_ref(value.encode('utf-8', 'surrogatepass'))
+        elif isinstance(value, bytes):
+            record = (_BYTES,) + heap_ref(value)
+        elif isinstance(value, datetime.datetime):
+            record = (_DATETIME,) + heap_ref(value.isoformat().encode('ascii'))
+        elif isinstance(value, datetime.date):
+            record = (_DATE,) + heap_ref(value.isoformat().encode('ascii'))
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            # Registered before the items, so a container that contains itself
+            # refers back to this node instead of recursing forever.
+            shared[id(value)] = index
+            items = [add(item) for item in value]
+            kind = _LIST if isinstance(value, (list, tuple)) else _SET
+            record = (kind, len(children), len(items))
+            children.extend(items)
+        elif isinstance(value, dict):
+            shared[id(value)] = index
+            items = []
+            for key, item in value.items():
+                items.append(add(key))
+                items.append(add(item))
+            record = (_MAP, len(children), len(value))
+            children.extend(items)
+        else:
+            raise TypeError(f"Cannot share value of type {type(value).__name__}")
+        nodes[index] = record
+        return index
+
+    add(data)
+
+    buffer = bytearray(_HEADER.size + _NODE.size * len(nodes) + _CHILD.size * len(children) + len(heap))
+    _HEADER.pack_into(buffer, 0, _MAGIC, len(nodes), len(children), len(heap))
+    offset = _HEADER.size
+    for record in nodes:
+        _NODE.pack_into(buffer, offset, *record)
+        offset += _NODE.size
+    for child in children:
+        _CHILD.pack_into(buffer, offset, child)
+        offset += _CHILD.size
+    buffer[offset:] = heap
+    return bytes(buffer)
+
+
+class FlatTree:
+    """
+    Read-only accessor for a flat buffer produced by `flatten_tree`.
+    """
+
+    def __init__(self, buf):
+        self.buf = memoryview(buf)
+        magic, node_count, child_count, _ = _HEADER.unpack_from(self.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError("Buffer does not contain a shared YAML tree.")
+        self.nodes_at = _HEADER.size
+        self.children_at = self.nodes_at + _NODE.size * node_count
+        self.heap_at = self.children_at + _CHILD.size * child_count
+
+    def root(self):
+        """Return the root node as a lazy view (or a plain value for scalars)."""
+        return self.node(0)
+
+    def record(self, index):
+        return _NODE.unpack_from(self.buf, self.nodes_at + _NODE.size * index)
+
+    def child(self, position):
+        return _CHILD.unpack_from(self.buf, self.children_at + _CHILD.size * position)[0]
+
+    def heap(self, offset, length):
+        start = self.heap_at + offset
+        return self.buf[start:start + length]
+
+    def node(self, index):
+        kind, a, b = self.record(index)
+        if kind == _LIST:
+            return LazySequence(self, index, a, b)
+        if kind == _MAP:
+            return LazyMapping(self, index, a, b)
+        if kind == _SET:
+            return self.materialize(index)
+        return self._scalar(kind, a, b)
+
+    def materialize(self, index, memo=None):
+        """
+        Rebuild the subtree rooted at node `index` as plain Python objects.
+        Nodes referenced more than once come back as the same object.
+        """
+        kind, a, b = self.record(index)
+        if kind not in (_LIST, _MAP, _SET):
+            return self._scalar(kind, a, b)
+        if memo is None:
+            memo = {}
+        if index in memo:
+            return memo[index]
+        if kind == _SET:
+            result = memo[index] = {self.materialize(self.child(a + i), memo) for i in range(b)}
+        elif kind == _LIST:
+            result = memo[index] = []
+            result.extend(self.materialize(self.child(a + i), memo) for i in range(b))
+        else:
+            result = memo[index] = {}
+            for i in range(b):
+                key = self.materialize(self.child(a + 2 * i), memo)
+                result[key] = self.materialize(self.child(a + 2 * i + 1), memo)
+        return result
+
+    def _scalar(self, kind, a, b):
+        if kind == _NULL:
+            return None
+        if kind == _TRUE:
+            return True
+        if kind == _FALSE:
+            return False
+        if kind == _INT:
+            return a
+        if kind == _FLOAT:
+            return struct.unpack('<d', struct.pack('<q', a))[0]
+        raw = self.heap(a, b)
+        if kind == _STR:
+            return str(raw, 'utf-8', 'surrogatepass')
+        if kind == _BYTES:
+            return bytes(raw)
+        if kind == _BIGINT:
+            return int(str(raw, 'ascii'))
+        if kind == _DATETIME:
+            return datetime.datetime.fromisoformat(str(raw, 'ascii'))
+        if kind == _DATE:
+            return datetime.date.fromisoformat(str(raw, 'ascii'))
+        raise ValueError(f"Unknown node kind {kind} in shared YAML tree.")
+
+
+class LazySequence(Sequence):
+    """
+    Sequence view over a list node; items are decoded on access.
+    """
+
+    def __init__(self, tree, index, first, count):
+        self._tree = tree
+        self._node = index
+        self._first = first
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("sequence index out of range")
+        return self._tree.node(self._tree.child(self._first + i))
+
+    def materialize(self):
+        return self._tree.materialize(self._node)
+
+
+class LazyMapping(Mapping):
+    """
+    Mapping view over a map node; keys are indexed on first lookup, values are
+    decoded on access.
+    """
+
+    def __init__(self, tree, index, first, count):
+        self._tree = tree
+        self._node = index
+        self._first = first
+        self._count = count
+        self._key_index = None
+
+    def _keys(self):
+        if self._key_index is None:
+            self._key_index = {
+                self._tree.materialize(self._tree.child(self._first + 2 * i)): self._first + 2 * i + 1
+                for i in range(self._count)
+            }
+        return self._key_index
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __getitem__(self, key):
+        return self._tree.node(self._tree.child(self._keys()[key]))
+
+    def materialize_item(self, key):
+        """Rebuild the value stored under `key` as plain Python objects."""
+        return self._tree.materialize(self._tree.child(self._keys()[key]))
+
+    def materialize_value_at(self, i):
+        """
+        Rebuild the `i`-th value (in document order) as plain Python objects.
+        Unlike `materialize_item`, this does not decode the keys.
+        """
+        if not 0 <= i < self._count:
+            raise IndexError("mapping position out of range")
+        return self._tree.materialize(self._tree.child(self._first + 2 * i + 1))
+
+    def materialize(self):
+        return self._tree.materialize(self._node)
+
+
+def materialize(node):
+    """Return `node` as plain Python objects, whether it is a lazy view or a scalar."""
+    if isinstance(node, (LazyMapping, LazySequence)):
+        return node.materialize()
+    return node
+
+
+def _attach(name):
+    """Pool initializer: map the shared tree into this worker without copying it."""
+    global _worker_shm, _worker_root
+    try:
+        shm = SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always tracks; pool workers share the parent's
+        # resource tracker, so the parent's unlink still clears the entry.
+        shm = SharedMemory(name=name)
+    _worker_shm = shm
+    _worker_root = FlatTree(shm.buf).root()
+
+
+def _call(job):
+    func, task = job
+    return func(_worker_root, task)
+
+
+def run_shared(data, func, tasks, jobs=None):
+    """
+    Run `func(root, task)` for every task in a pool of `jobs` worker processes.
+
+    `data` is flattened into shared memory once; each worker receives `root`,
+    a lazy view of that tree, instead of its own pickled copy. `func` must be a
+    module-level function. Results are returned in task order.
+    """
+    buf = flatten_tree(data)
+    shm = SharedMemory(create=True, size=max(len(buf), 1))
+    try:
+        shm.buf[:len(buf)] = buf
+        del buf
+        with Pool(processes=jobs, initializer=_attach, initargs=(shm.name,)) as pool:
+            return pool.map(_call, [(func, task) for task in tasks])
+    finally:
+        shm.close()
+        shm.unlink()